@@ -1,88 +1,275 @@
 import json
+import mmap
+import multiprocessing
+import os
+import re
 import sqlite3
-from typing import Dict, Any, Set, List
+from typing import Dict, Any, Set, List, Tuple, FrozenSet, Optional, Iterator, Iterable, Callable, Union, Deque, Literal
 import logging
+from functools import lru_cache
+from collections import deque
+from itertools import chain, islice
 from pathlib import Path
 
+try:
+    # orjson parses several times faster than the standard library; its
+    # JSONDecodeError subclasses json.JSONDecodeError so error handling is unchanged
+    import orjson
+    
+    # orjson turns integers below -2**63 or from 2**64 up into rounded floats, so text with
+    # a digit run that long is decoded by the standard library, which keeps them exact
+    _LONG_INTEGER = re.compile(rb'-\d{19}|\d{20}')
+    
+    def json_loads(data: bytes) -> Any:
+        if _LONG_INTEGER.search(data) is not None:
+            return json.loads(data)
+        return orjson.loads(data)
+    
+    def json_dumps(value: Any) -> str:
+        try:
+            return orjson.dumps(value).decode()
+        except orjson.JSONEncodeError:
+            # orjson refuses integers wider than 64 bits, the standard library writes them exactly
+            return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(value: Any) -> str:
+        # Same compact, non-ASCII preserving output as orjson
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+try:
+    # ijson streams large top-level arrays; it selects its fastest available
+    # backend (the yajl2_c C extension) on its own
+    import ijson
+    JSON_DECODE_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+try:
+    # msgspec decodes JSON Lines records straight into typed Structs once the schema is known
+    import msgspec
+except ImportError:
+    msgspec = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of rows inserted per explicit transaction
+BATCH_SIZE = 10000
+# Rows packed into a single multi-row INSERT statement
+ROWS_PER_INSERT = 100
+# Bound parameter limit of older SQLite builds (SQLITE_MAX_VARIABLE_NUMBER)
+MAX_VARIABLES = 999
+# Size of sqlite3's prepared statement cache (the default of 128 is easily exceeded
+# by the per-table, per-column-set INSERT statements)
+STATEMENT_CACHE_SIZE = 256
+# Records sampled at the start of a file to discover the schema before inserting
+SCHEMA_SAMPLE_SIZE = 10000
+# Size of the newline-aligned byte ranges of a JSON Lines file handed to each worker process
+PARALLEL_CHUNK_BYTES = 4 * 1024 * 1024
+# Widening order used when merging the types seen for a column
+TYPE_RANK = {'BOOLEAN': 0, 'INTEGER': 1, 'REAL': 2, 'TEXT': 3}
+# Range of SQLite's 64-bit INTEGER, Python ints outside of it can't be bound
+SQLITE_INT_MIN = -2**63
+SQLITE_INT_MAX = 2**63 - 1
+# Any JSON value that is stored directly in a column
+JSON_SCALAR = Union[bool, int, float, str, None]
+
+# SQLite reserved keywords that could appear as column names
+RESERVED_KEYWORDS = frozenset({
+    'abort', 'action', 'add', 'after', 'all', 'alter', 'analyze', 'and', 'as', 'asc',
+    'attach', 'autoincrement', 'before', 'begin', 'between', 'by', 'cascade', 'case',
+    'cast', 'check', 'collate', 'column', 'commit', 'conflict', 'constraint', 'create',
+    'cross', 'current', 'current_date', 'current_time', 'current_timestamp', 'database',
+    'default', 'deferrable', 'deferred', 'delete', 'desc', 'detach', 'distinct', 'drop',
+    'each', 'else', 'end', 'escape', 'except', 'exclusive', 'exists', 'explain', 'fail',
+    'for', 'foreign', 'from', 'full', 'glob', 'group', 'having', 'if', 'ignore',
+    'immediate', 'in', 'index', 'indexed', 'initially', 'inner', 'insert', 'instead',
+    'intersect', 'into', 'is', 'isnull', 'join', 'key', 'left', 'like', 'limit', 'match',
+    'natural', 'no', 'not', 'notnull', 'null', 'of', 'offset', 'on', 'or', 'order',
+    'outer', 'plan', 'pragma', 'primary', 'query', 'raise', 'recursive', 'references',
+    'regexp', 'reindex', 'release', 'rename', 'replace', 'restrict', 'right', 'rollback',
+    'row', 'savepoint', 'select', 'set', 'table', 'temp', 'temporary', 'then', 'to',
+    'transaction', 'trigger', 'type', 'union', 'unique', 'update', 'using', 'vacuum',
+    'values', 'view', 'virtual', 'when', 'where', 'with', 'without'
+})
+
+# SQLite type of each decoded JSON value type, looked up by exact type so bool isn't
+# taken for int; REFERENCE values go to a separate table and anything else is TEXT
+_TYPE_MAP = {
+    bool: 'BOOLEAN', int: 'INTEGER', float: 'REAL', str: 'TEXT',
+    dict: 'REFERENCE', list: 'REFERENCE', type(None): 'TEXT',
+}
+
+# Translation table replacing every non-alphanumeric ASCII character with an underscore
+_SANITIZE_TABLE = {i: '_' for i in range(128) if not chr(i).isalnum()}
+
+def _queue_nested(table_name: str, nested_data: Iterable[Tuple[str, Any]], row__id: int,
+                  work: Deque[Tuple[str, Dict[str, Any], int, str]]) -> None:
+    """Add the nested objects/arrays of a row to the work queue for their own tables."""
+    for key, value in nested_data:
+        nested_table = f"{table_name}__{key}"
+        if isinstance(value, dict):
+            work.append((nested_table, value, row__id, table_name))
+        elif isinstance(value, list) and value:
+            if all(isinstance(item, dict) for item in value):
+                for item in value:
+                    work.append((nested_table, item, row__id, table_name))
+
+def _int_out_of_range(key: str, value: int) -> OverflowError:
+    """Error for a record whose integer value doesn't fit in a SQLite INTEGER.
+    Such records are rejected before any of their rows get an id, so no nested row
+    is ever left referring to a parent row that failed to insert."""
+    return OverflowError(f"Integer {value} of {key!r} is out of SQLite's 64-bit range")
+
+def _compile_packer(table_name: str, key_kinds: Dict[str, Set[str]], key_map: Dict[str, str],
+                    from_struct: bool, dump_nested: bool = False) -> Callable:
+    """Generate and compile a function packing one record of a table.
+    The function returns the record's values in packer column order along with its
+    nested (column, value) pairs, with every key lookup and sanitized name inlined.
+    Dict records with unknown keys or values of an unexpected kind make it return None
+    so they can take the generic path; Structs were already validated by msgspec.
+    Integers that can't be bound raise (see _int_out_of_range).
+    With dump_nested, nested objects/arrays in value columns are stored as JSON text."""
+    lines = ["def pack(record):"]
+    if not from_struct:
+        lines.append("    if not KEYS.issuperset(record): return None")
+        lines.append("    get = record.get")
+    lines.append("    nested = []")
+    values = []
+    for i, (key, kinds) in enumerate(key_kinds.items()):
+        column_name = key_map[key]
+        lines.append(f"    v{i} = record.f{i}" if from_struct else f"    v{i} = get({key!r})")
+        is_nested = f"type(v{i}) is dict or type(v{i}) is list"
+        if kinds != {'nested'}:
+            lines.append(
+                f"    if type(v{i}) is int and not {SQLITE_INT_MIN} <= v{i} <= {SQLITE_INT_MAX}:"
+                f" raise out_of_range({key!r}, v{i})"
+            )
+        if 'nested' not in kinds:
+            if dump_nested:
+                lines.append(f"    if {is_nested}: v{i} = dumps(v{i})")
+            elif not from_struct:
+                lines.append(f"    if {is_nested}: return None")
+            values.append(f"v{i}")
+        elif 'scalar' not in kinds:
+            lines.append(f"    if v{i} is not None:")
+            if not from_struct:
+                lines.append(f"        if not ({is_nested}): return None")
+            lines.append(f"        nested.append(({column_name!r}, v{i}))")
+        else:
+            # Seen both as a value and as a nested object/array, so check at runtime
+            lines.extend([
+                f"    if {is_nested}:",
+                f"        nested.append(({column_name!r}, v{i}))",
+                f"        v{i} = None",
+            ])
+            values.append(f"v{i}")
+    lines.append(f"    return ({''.join(f'{v}, ' for v in values)}), nested")
+    
+    namespace = {'KEYS': frozenset(key_kinds), 'dumps': json_dumps, 'out_of_range': _int_out_of_range}
+    exec(compile("\n".join(lines), f"<pack {table_name}>", "exec"), namespace)
+    return namespace['pack']
+
 class JsonToSqlite:
-    def __init__(self, db_path: str, root_table: str = 'root'):
-        """Initialize the converter with database path and root table name."""
+    def __init__(self, db_path: str, root_table: str = 'root',
+                 defer_indexes: Optional[List[Tuple[str, str]]] = None, workers: int = 1,
+                 flatten_mode: Literal['normalize', 'json_columns'] = 'normalize'):
+        """Initialize the converter with database path and root table name.
+        defer_indexes lists (table, comma separated columns) indexes to create once loading
+        is finished, together with indexes on the parent reference columns of nested tables.
+        With more than one worker, JSON Lines records are decoded and packed in that many
+        processes while this one does all the SQLite writes.
+        flatten_mode 'normalize' stores nested objects/arrays of objects in child tables,
+        'json_columns' stores every nested value as JSON text in its parent's row instead."""
+        if flatten_mode not in ('normalize', 'json_columns'):
+            raise ValueError(f"Unknown flatten_mode {flatten_mode!r}")
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.defer_indexes = defer_indexes or []
+        self.workers = max(1, workers)
+        self.flatten_mode = flatten_mode
+        # Autocommit mode so that transactions are controlled with explicit BEGIN/COMMIT
+        self.conn = sqlite3.connect(db_path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
         self.cursor = self.conn.cursor()
+        # The page size of a new database is fixed by its first table and can't change in WAL mode
+        self.cursor.execute("PRAGMA page_size=32768")
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA mmap_size=30000000000")
+        self.cursor.execute("PRAGMA cache_size=-262144")
+        # Nothing else reads the database while it is being loaded
+        self.cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+        # Parent references are written by this loader itself, not declared as foreign keys
+        self.cursor.execute("PRAGMA foreign_keys=OFF")
         self.known_tables: Dict[str, Set[str]] = {}
+        # Parent reference column of each table (None for the root table), set at creation
+        self._parent_fk_col: Dict[str, Optional[str]] = {}
+        # Next row__id per table and rows waiting to be written, keyed by (table, columns)
+        self._next_row_id: Dict[str, int] = {}
+        self._pending: Dict[Tuple[str, Tuple[str, ...]], List[Tuple[Any, ...]]] = {}
+        # Canonical column order per column set, and cached INSERT statements
+        self._canonical_columns: Dict[Tuple[str, FrozenSet[str]], Tuple[str, ...]] = {}
+        self._row_layouts: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple[str, ...], Optional[Tuple[int, ...]]]] = {}
+        self._insert_sql: Dict[Tuple[str, Tuple[str, ...], int], str] = {}
+        # Sanitized column name of each raw key seen per table, so rows don't re-sanitize keys
+        self._key_map: Dict[str, Dict[str, str]] = {}
+        # Raw keys seen per table, each with whether it held a 'scalar' value, a 'nested' one or both
+        self._key_kinds: Dict[str, Dict[str, Set[str]]] = {}
+        # Generated per-table packers for records shaped like the known keys (see _compile_packer)
+        self._packers: Dict[str, Callable[[Dict[str, Any]], Optional[Tuple[Tuple[Any, ...], List[Tuple[str, Any]]]]]] = {}
+        self._packer_columns: Dict[str, Tuple[str, ...]] = {}
+        self._stale_packers: Set[str] = set()
+        # JSON Lines decoding, switched to a msgspec Struct decoder once the schema is known
+        self._reading_lines = False
+        self._decode_line: Callable[[bytes], Any] = json_loads
+        self._record_type: Optional[type] = None
+        self._record_packer: Optional[Callable[[Any], Tuple[Tuple[Any, ...], List[Tuple[str, Any]]]]] = None
+        self._record_columns: Tuple[str, ...] = ()
+        # Table names are sanitized only here: nested tables are named f"{parent}__{column}"
+        # from an already sanitized parent and column name, so every table name passed
+        # around internally is already sanitized
         self.root_table = self._sanitize_name(root_table)
         
-    def _sanitize_name(self, name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _sanitize_name(name: str) -> str:
         """Convert a JSON key to a valid SQLite column name.
-        Also handles SQLite reserved keywords by prefixing them with an underscore."""
-        # List of SQLite reserved keywords that could appear as column names
-        reserved_keywords = {
-            'abort', 'action', 'add', 'after', 'all', 'alter', 'analyze', 'and', 'as', 'asc',
-            'attach', 'autoincrement', 'before', 'begin', 'between', 'by', 'cascade', 'case',
-            'cast', 'check', 'collate', 'column', 'commit', 'conflict', 'constraint', 'create',
-            'cross', 'current', 'current_date', 'current_time', 'current_timestamp', 'database',
-            'default', 'deferrable', 'deferred', 'delete', 'desc', 'detach', 'distinct', 'drop',
-            'each', 'else', 'end', 'escape', 'except', 'exclusive', 'exists', 'explain', 'fail',
-            'for', 'foreign', 'from', 'full', 'glob', 'group', 'having', 'if', 'ignore',
-            'immediate', 'in', 'index', 'indexed', 'initially', 'inner', 'insert', 'instead',
-            'intersect', 'into', 'is', 'isnull', 'join', 'key', 'left', 'like', 'limit', 'match',
-            'natural', 'no', 'not', 'notnull', 'null', 'of', 'offset', 'on', 'or', 'order',
-            'outer', 'plan', 'pragma', 'primary', 'query', 'raise', 'recursive', 'references',
-            'regexp', 'reindex', 'release', 'rename', 'replace', 'restrict', 'right', 'rollback',
-            'row', 'savepoint', 'select', 'set', 'table', 'temp', 'temporary', 'then', 'to',
-            'transaction', 'trigger', 'type', 'union', 'unique', 'update', 'using', 'vacuum',
-            'values', 'view', 'virtual', 'when', 'where', 'with', 'without'
-        }
-        
-        # First sanitize the name to remove invalid characters
-        sanitized = ''.join(c if c.isalnum() else '_' for c in name)
+        Also handles SQLite reserved keywords by prefixing them with an underscore.
+        Results are cached since the same keys are sanitized for every row."""
+        # First sanitize the name to remove invalid characters, in C for plain ASCII names
+        if name.isascii():
+            sanitized = name.translate(_SANITIZE_TABLE)
+        else:
+            sanitized = ''.join(c if c.isalnum() else '_' for c in name)
         
         # Then check if it's a reserved keyword (case-insensitive check)
-        if sanitized.lower() in reserved_keywords:
+        if sanitized.lower() in RESERVED_KEYWORDS:
             sanitized = f"_{sanitized}"
             
         return sanitized
 
     def _get_sqlite_type(self, value: Any) -> str:
         """Determine SQLite type from Python value."""
-        if isinstance(value, bool):
-            return 'BOOLEAN'
-        elif isinstance(value, int):
-            return 'INTEGER'
-        elif isinstance(value, float):
-            return 'REAL'
-        elif isinstance(value, (dict, list)):
-            return 'REFERENCE'  # This indicates we need a separate table
-        else:
-            return 'TEXT'
+        sqlite_type = _TYPE_MAP.get(type(value), 'TEXT')
+        if sqlite_type == 'REFERENCE' and self.flatten_mode == 'json_columns':
+            return 'TEXT'  # Stored as JSON text
+        return sqlite_type
 
     def _create_table_if_not_exists(self, table_name: str, data: Dict[str, Any], parent_table: str = None) -> None:
         """Create a table if it doesn't exist, or alter it if it needs new columns."""
-        table_name = self._sanitize_name(table_name)
-        
         # Initialize table in known_tables if not present
         if table_name not in self.known_tables:
-            self.known_tables[table_name] = set()
-            
-            # Create table with id and parent reference if needed
-            columns = ['row__id INTEGER PRIMARY KEY AUTOINCREMENT']
-            if parent_table:
-                parent_ref = f'{parent_table}_id INTEGER'
-                columns.append(parent_ref)
-                
-            self.cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    {', '.join(columns)}
-                )
-            """)
+            self._create_table(table_name, parent_table)
         
         # Process each field in the data
+        key_map = self._key_map.setdefault(table_name, {})
         for key, value in data.items():
-            column_name = self._sanitize_name(key)
+            column_name = key_map.get(key)
+            if column_name is None:
+                column_name = key_map[key] = self._sanitize_name(key)
             
             if column_name not in self.known_tables[table_name]:
                 sqlite_type = self._get_sqlite_type(value)
@@ -103,101 +290,388 @@ class JsonToSqlite:
                             for item in value:
                                 merged_schema.update(item)
                             
-                            if merged_schema:  # Only process if we have data
-                                self._create_table_if_not_exists(
-                                    f"{table_name}__{column_name}",
-                                    merged_schema,
-                                    table_name
-                                )
+                            # Create the table even for empty objects, their rows still get inserted
+                            self._create_table_if_not_exists(
+                                f"{table_name}__{column_name}",
+                                merged_schema,
+                                table_name
+                            )
                 else:
-                    # Add new column to existing table
-                    try:
-                        self.cursor.execute(f"""
-                            ALTER TABLE {table_name}
-                            ADD COLUMN {column_name} {sqlite_type}
-                        """)
-                        self.known_tables[table_name].add(column_name)
-                    except sqlite3.OperationalError as e:
-                        if "duplicate column name" not in str(e):
-                            raise
-
-    def _insert_data(self, table_name: str, data: Dict[str, Any], parent_id: int = None) -> int:
-        """Insert data into a table and return the inserted row's ID."""
-        try:
-            table_name = self._sanitize_name(table_name)
-            simple_data = {}
-            nested_data = {}
+                    self._add_column(table_name, column_name, sqlite_type)
+
+    def _create_table(self, table_name: str, parent_table: str = None) -> None:
+        """Create a table with its id column and parent reference if needed.
+        The table may already exist in the database, so its columns are read back once here
+        and known_tables is kept up to date from then on."""
+        # No indexes besides the primary key here, they are built after the load in finalize()
+        columns = ['row__id INTEGER PRIMARY KEY AUTOINCREMENT']
+        self._parent_fk_col[table_name] = None
+        if parent_table:
+            parent_ref_col = f'{parent_table}_id'
+            columns.append(f'{parent_ref_col} INTEGER')
+            self._parent_fk_col[table_name] = parent_ref_col
             
-            # Separate simple values from nested objects/arrays
+        self.cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                {', '.join(columns)}
+            )
+        """)
+        self.cursor.execute(f"PRAGMA table_info({table_name})")
+        self.known_tables[table_name] = {row[1] for row in self.cursor.fetchall()}
+
+    def _add_column(self, table_name: str, column_name: str, sqlite_type: str) -> None:
+        """Add a new column to an existing table.
+        SQLite column names are case-insensitive, so a name differing only in case from a
+        known column refers to that column and is only recorded as known."""
+        # An empty name would make "ADD COLUMN  TEXT" add a column named after its type,
+        # and names starting with a digit aren't valid unquoted identifiers
+        if not column_name or column_name[0] in '0123456789':
+            raise ValueError(f"Invalid column name {column_name!r}")
+        known_columns = self.known_tables[table_name]
+        if column_name.lower() not in {known.lower() for known in known_columns}:
+            self.cursor.execute(f"""
+                ALTER TABLE {table_name}
+                ADD COLUMN {column_name} {sqlite_type}
+            """)
+        known_columns.add(column_name)
+
+    def _discover_schema(self, records: Iterable[Any]) -> None:
+        """Create all tables and columns seen in a sample of records up front.
+        Column types are merged across the sample, widening BOOLEAN < INTEGER < REAL < TEXT,
+        so that inserting the full file rarely needs to ALTER a table mid-load."""
+        parents: Dict[str, Optional[str]] = {self.root_table: None}
+        schema: Dict[str, Dict[str, Optional[str]]] = {self.root_table: {}}
+        
+        def merge(table_name: str, data: Dict[str, Any]) -> None:
+            columns = schema[table_name]
+            key_kinds = self._key_kinds.setdefault(table_name, {})
+            key_map = self._key_map.setdefault(table_name, {})
             for key, value in data.items():
-                column_name = self._sanitize_name(key)
-                if isinstance(value, (dict, list)):
-                    nested_data[column_name] = value
+                column_name = key_map.get(key)
+                if column_name is None:
+                    column_name = key_map[key] = self._sanitize_name(key)
+                sqlite_type = self._get_sqlite_type(value)
+                key_kinds.setdefault(key, set()).add('nested' if sqlite_type == 'REFERENCE' else 'scalar')
+                
+                if sqlite_type == 'REFERENCE':
+                    if isinstance(value, dict):
+                        items = [value]
+                    elif value and all(isinstance(item, dict) for item in value):
+                        items = value
+                    else:
+                        continue
+                    nested_table = f"{table_name}__{column_name}"
+                    if nested_table not in schema:
+                        parents[nested_table] = table_name
+                        schema[nested_table] = {}
+                    for item in items:
+                        merge(nested_table, item)
+                elif value is None:
+                    # Nulls carry no type information, they only make sure the column exists
+                    columns.setdefault(column_name, None)
                 else:
-                    simple_data[column_name] = value
-            
-            # Insert simple data
-            if simple_data:
-                columns = list(simple_data.keys())
-                values = list(simple_data.values())
-                placeholders = ['?' for _ in values]
+                    current = columns.get(column_name)
+                    if current is None or TYPE_RANK[sqlite_type] > TYPE_RANK[current]:
+                        columns[column_name] = sqlite_type
+        
+        for data in records:
+            if isinstance(data, dict):
+                merge(self.root_table, data)
+        
+        # Parents are always recorded before their nested tables
+        for table_name, columns in schema.items():
+            if table_name not in self.known_tables:
+                self._create_table(table_name, parents[table_name])
+            for column_name, sqlite_type in columns.items():
+                if column_name not in self.known_tables[table_name]:
+                    try:
+                        self._add_column(table_name, column_name, sqlite_type or 'TEXT')
+                    except (sqlite3.OperationalError, ValueError) as e:
+                        # Forget the keys so that records carrying them take the generic path,
+                        # which logs them as errors, while the rest of the file still loads
+                        logger.error(f"Error adding column {column_name} to {table_name}: {e}")
+                        key_map = self._key_map[table_name]
+                        for key in [key for key, name in key_map.items() if name == column_name]:
+                            del key_map[key]
+                            self._key_kinds[table_name].pop(key, None)
+            self._stale_packers.add(table_name)
+
+    def _allocate_row_id(self, table_name: str, count: int = 1) -> int:
+        """Reserve the next count row__ids for a table and return the first one.
+        Ids are assigned here rather than by SQLite so that child rows can reference
+        their parent while the parent row is still waiting in a pending batch."""
+        row__id = self._next_row_id.get(table_name)
+        if row__id is None:
+            self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table_name,))
+            row = self.cursor.fetchone()
+            row__id = row[0] if row else 0
+        self._next_row_id[table_name] = row__id + count
+        return row__id + 1
+
+    def _row_layout(self, table_name: str, columns: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Optional[Tuple[int, ...]]]:
+        """Map a row's column order onto the canonical order for its column set.
+        The first order seen for a set of columns becomes canonical, so records that list
+        the same keys in a different order share one batch and one cached INSERT statement."""
+        canonical = self._canonical_columns.setdefault((table_name, frozenset(columns)), columns)
+        order = None if canonical == columns else tuple(columns.index(c) for c in canonical)
+        layout = self._row_layouts[(table_name, columns)] = (canonical, order)
+        return layout
+
+    def _queue_row(self, table_name: str, columns: Tuple[str, ...], values: Tuple[Any, ...]) -> None:
+        """Add a row to the pending batch for its table and column set."""
+        layout = self._row_layouts.get((table_name, columns))
+        if layout is None:
+            layout = self._row_layout(table_name, columns)
+        columns, order = layout
+        if order is not None:
+            values = tuple(values[i] for i in order)
+        
+        key = (table_name, columns)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+        batch.append(values)
+        if len(batch) >= BATCH_SIZE:
+            self._flush_batch(key)
+
+    def _queue_rows(self, table_name: str, columns: Tuple[str, ...], rows: List[Tuple[Any, ...]]) -> None:
+        """Add rows sharing one column set to the pending batch for their table."""
+        layout = self._row_layouts.get((table_name, columns))
+        if layout is None:
+            layout = self._row_layout(table_name, columns)
+        columns, order = layout
+        if order is not None:
+            rows = [tuple(values[i] for i in order) for values in rows]
+        
+        key = (table_name, columns)
+        batch = self._pending.setdefault(key, [])
+        batch.extend(rows)
+        if len(batch) >= BATCH_SIZE:
+            self._flush_batch(key)
+
+    def _insert_query(self, table_name: str, columns: Tuple[str, ...], row_count: int) -> str:
+        """Build (and cache) an INSERT statement with row_count rows in its VALUES clause.
+        Reusing the same string lets sqlite3's statement cache skip re-preparing it."""
+        key = (table_name, columns, row_count)
+        query = self._insert_sql.get(key)
+        if query is None:
+            row_placeholders = f"({', '.join('?' for _ in columns)})"
+            query = f"""
+                INSERT INTO {table_name} ({', '.join(columns)})
+                VALUES {', '.join([row_placeholders] * row_count)}
+            """
+            self._insert_sql[key] = query
+        return query
+
+    def _flush_batch(self, key: Tuple[str, Tuple[str, ...]]) -> None:
+        """Write one pending batch using multi-row INSERT statements."""
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        table_name, columns = key
+        # Stay within SQLite's historic limit on the number of bound parameters
+        rows_per_insert = max(1, min(ROWS_PER_INSERT, MAX_VARIABLES // len(columns)))
+        full_count = len(batch) - len(batch) % rows_per_insert
+        
+        # Run the batch inside a savepoint so a bad row doesn't leave it half written.
+        # Rows go through the connection's execute shortcuts, self.cursor is kept for DDL
+        # and transaction control
+        self.cursor.execute("SAVEPOINT flush_batch")
+        try:
+            if full_count:
+                query = self._insert_query(table_name, columns, rows_per_insert)
+                self.conn.executemany(query, (
+                    tuple(chain.from_iterable(batch[i:i + rows_per_insert]))
+                    for i in range(0, full_count, rows_per_insert)
+                ))
+            if full_count < len(batch):
+                query = self._insert_query(table_name, columns, len(batch) - full_count)
+                self.conn.execute(query, tuple(chain.from_iterable(batch[full_count:])))
+        except Exception as e:
+            self.cursor.execute("ROLLBACK TO flush_batch")
+            logger.warning(f"Batch insert into {table_name} failed ({e}), inserting rows one at a time")
+            query = self._insert_query(table_name, columns, 1)
+            for values in batch:
+                try:
+                    self.conn.execute(query, values)
+                except Exception as e:
+                    logger.error(f"Error inserting data: {table_name} {values[0]} {e}")
+        finally:
+            self.cursor.execute("RELEASE flush_batch")
+
+    def _flush_pending(self) -> None:
+        """Write all pending batches to the database."""
+        for key in list(self._pending):
+            self._flush_batch(key)
+
+    def _insert_data(self, table_name: str, data: Dict[str, Any], parent_id: int = None,
+                     parent_table: str = None) -> int:
+        """Queue data and its nested objects for insertion and return the row's ID."""
+        work: Deque[Tuple[str, Dict[str, Any], int, str]] = deque()
+        row__id = self._insert_row(table_name, data, parent_id, parent_table, work)
+        self._insert_nested_rows(work)
+        return row__id
+
+    def _insert_nested_rows(self, work: Deque[Tuple[str, Dict[str, Any], int, str]]) -> None:
+        """Insert queued nested objects breadth first, queueing their own nested objects in turn.
+        An explicit work queue avoids a Python call frame per nesting level and any recursion limit."""
+        while work:
+            self._insert_row(*work.popleft(), work)
+
+    def _insert_row(self, table_name: str, data: Dict[str, Any], parent_id: Optional[int],
+                    parent_table: Optional[str], work: Deque[Tuple[str, Dict[str, Any], int, str]]) -> int:
+        """Queue one row for insertion and its nested objects onto the work queue, return the row's ID."""
+        try:
+            packer = self._packers.get(table_name)
+            packed = packer(data) if packer is not None else None
+            if packed is not None:
+                values, nested_data = packed
+                columns = self._packer_columns[table_name]
+            else:
+                # Shapes the table's packer doesn't cover evolve the schema and go the generic way
+                self._create_table_if_not_exists(table_name, data, parent_table)
+                key_kinds = self._key_kinds.setdefault(table_name, {})
+                # _create_table_if_not_exists has just mapped every key of the record
+                key_map = self._key_map[table_name]
+                simple_data = {}
+                nested_data = []
                 
-                if parent_id is not None:
-                    # Get parent table name by splitting on double underscore
-                    parent_table = '__'.join(table_name.split('__')[:-1])
-                    parent_ref_col = f"{parent_table}_id"
-                    columns.append(parent_ref_col)
-                    values.append(parent_id)
-                    placeholders.append('?')
+                # Separate simple values from nested objects/arrays
+                for key, value in data.items():
+                    column_name = key_map[key]
+                    if isinstance(value, (dict, list)) and self.flatten_mode == 'json_columns':
+                        simple_data[column_name] = json_dumps(value)
+                        kind = 'scalar'
+                    elif isinstance(value, (dict, list)):
+                        nested_data.append((column_name, value))
+                        kind = 'nested'
+                    else:
+                        if type(value) is int and not SQLITE_INT_MIN <= value <= SQLITE_INT_MAX:
+                            raise _int_out_of_range(key, value)
+                        simple_data[column_name] = value
+                        kind = 'scalar'
+                    kinds = key_kinds.get(key)
+                    if kinds is None or kind not in kinds:
+                        key_kinds.setdefault(key, set()).add(kind)
+                        self._stale_packers.add(table_name)
                 
-                query = f"""
-                    INSERT INTO {table_name} ({', '.join(columns)})
-                    VALUES ({', '.join(placeholders)})
-                """
-                self.cursor.execute(query, values)
-                row__id = self.cursor.lastrowid
-            else:
-                # If there's no simple data but we need a row for nested data
-                if parent_id is not None:
-                    parent_table = '__'.join(table_name.split('__')[:-1])
-                    parent_ref_col = f"{parent_table}_id"
-                    query = f"""
-                        INSERT INTO {table_name} ({parent_ref_col})
-                        VALUES (?)
-                    """
-                    self.cursor.execute(query, [parent_id])
-                    row__id = self.cursor.lastrowid
-                else:
-                    query = f"INSERT INTO {table_name} DEFAULT VALUES"
-                    self.cursor.execute(query)
-                    row__id = self.cursor.lastrowid
+                columns = ['row__id']
+                parent_ref_col = self._parent_fk_col[table_name]
+                if parent_ref_col is not None:
+                    columns.append(parent_ref_col)
+                # Keys landing on the id columns (case-insensitively, like SQLite) are dropped,
+                # the allocated ids are the ones stored and referenced by nested rows
+                id_columns = {column.lower() for column in columns}
+                for column_name in [c for c in simple_data if c.lower() in id_columns]:
+                    del simple_data[column_name]
+                columns.extend(simple_data.keys())
+                columns = tuple(columns)
+                values = simple_data.values()
             
-            # Handle nested data
-            for key, value in nested_data.items():
-                nested_table = f"{table_name}__{key}"
-                if isinstance(value, dict):
-                    # Make sure table exists (might have been missed during schema detection)
-                    self._create_table_if_not_exists(nested_table, value, table_name)
-                    self._insert_data(nested_table, value, row__id)
-                elif isinstance(value, list) and value:
-                    if all(isinstance(item, dict) for item in value):
-                        # First ensure the table exists by creating a merged schema
-                        merged_schema = {}
-                        for item in value:
-                            merged_schema.update(item)
-                        
-                        if merged_schema:  # Only process if we have data
-                            self._create_table_if_not_exists(nested_table, merged_schema, table_name)
-                            
-                        # Then insert each item in the list
-                        for item in value:
-                            self._insert_data(nested_table, item, row__id)
+            # Queue simple data, always including the row id so nested rows can refer to it
+            row__id = self._allocate_row_id(table_name)
+            if parent_id is not None:
+                self._queue_row(table_name, columns, (row__id, parent_id, *values))
+            else:
+                self._queue_row(table_name, columns, (row__id, *values))
             
+            if nested_data:
+                _queue_nested(table_name, nested_data, row__id, work)
             return row__id
         except Exception as e:
             logger.error(f"Error inserting data: {table_name} {parent_id} {e}")
             raise e
 
+    def _packer_columns_for(self, table_name: str, key_kinds: Dict[str, Set[str]]) -> Tuple[str, ...]:
+        """Columns written by a table's packer: row id, parent reference, then the value keys."""
+        columns = ['row__id']
+        parent_ref_col = self._parent_fk_col[table_name]
+        if parent_ref_col is not None:
+            columns.append(parent_ref_col)
+        key_map = self._key_map[table_name]
+        columns.extend(key_map[key] for key, kinds in key_kinds.items() if kinds != {'nested'})
+        return tuple(columns)
+
+    def _has_column_clash(self, table_name: str, key_kinds: Dict[str, Set[str]]) -> bool:
+        """Whether keys sanitize onto each other or onto the row id / parent reference columns,
+        compared case-insensitively like SQLite does. Such tables rely on the generic handling
+        (which keeps the allocated ids) and get no packer."""
+        columns = self._packer_columns_for(table_name, {key: {'scalar'} for key in key_kinds})
+        return len({column.lower() for column in columns}) != len(columns)
+
+    def _refresh_packers(self) -> None:
+        """Regenerate the packers of tables whose known keys changed.
+        Called between batches so that heterogeneous input doesn't recompile per record."""
+        for table_name in self._stale_packers:
+            key_kinds = self._key_kinds.get(table_name)
+            if not key_kinds or self._has_column_clash(table_name, key_kinds):
+                self._packers.pop(table_name, None)
+                continue
+            self._packers[table_name] = _compile_packer(
+                table_name, key_kinds, self._key_map[table_name], from_struct=False,
+                dump_nested=self.flatten_mode == 'json_columns'
+            )
+            self._packer_columns[table_name] = self._packer_columns_for(table_name, key_kinds)
+        
+        if self.root_table in self._stale_packers and self._reading_lines:
+            self._decode_line = self._build_record_decoder()
+        self._stale_packers.clear()
+
+    def _build_record_decoder(self) -> Callable[[bytes], Any]:
+        """Build a decoder for JSON Lines records shaped like the ones seen so far.
+        With msgspec, lines decode straight into a Struct following the root schema, and a
+        generated packer reads its fields in column order without per-key type dispatch.
+        Lines the Struct doesn't describe (new keys, other types, invalid JSON) are decoded
+        with json_loads instead and take the generic path."""
+        self._record_type = None
+        key_kinds = self._key_kinds.get(self.root_table)
+        if msgspec is None or not key_kinds or self._has_column_clash(self.root_table, key_kinds):
+            return json_loads
+        
+        fields = []
+        rename = {}
+        for i, (key, kinds) in enumerate(key_kinds.items()):
+            field = f"f{i}"
+            rename[field] = key
+            if 'nested' not in kinds and self.flatten_mode == 'json_columns':
+                # Nested values of these columns are dumped to JSON text by the packer
+                fields.append((field, Any, None))
+            elif 'nested' not in kinds:
+                fields.append((field, JSON_SCALAR, None))
+            elif 'scalar' not in kinds:
+                fields.append((field, Union[Dict[str, Any], List[Any], None], None))
+            else:
+                fields.append((field, Any, None))
+        
+        self._record_packer = _compile_packer(
+            self.root_table, key_kinds, self._key_map[self.root_table], from_struct=True,
+            dump_nested=self.flatten_mode == 'json_columns'
+        )
+        self._record_columns = self._packer_columns_for(self.root_table, key_kinds)
+        self._record_type = msgspec.defstruct(
+            'Record', fields, rename=rename, forbid_unknown_fields=True, gc=False
+        )
+        decoder = msgspec.json.Decoder(self._record_type)
+        
+        def decode(line: bytes) -> Any:
+            try:
+                return decoder.decode(line)
+            except msgspec.DecodeError:
+                return json_loads(line)
+        
+        return decode
+
+    def _insert_record(self, record: Any) -> int:
+        """Queue a root record decoded into the msgspec Struct and return the row's ID."""
+        values, nested = self._record_packer(record)
+        row__id = self._allocate_row_id(self.root_table)
+        self._queue_row(self.root_table, self._record_columns, (row__id, *values))
+        if nested:
+            work: Deque[Tuple[str, Dict[str, Any], int, str]] = deque()
+            _queue_nested(self.root_table, nested, row__id, work)
+            self._insert_nested_rows(work)
+        return row__id
+
     def process_file(self, file_path: str) -> None:
         """Process either a JSON Lines file or a regular JSON file and load it into SQLite."""
         file_path = Path(file_path)
@@ -215,34 +689,180 @@ class JsonToSqlite:
             else:  # Assume JSON Lines
                 self._process_jsonlines_file(file_path)
 
+    def _iter_json_array(self, file_path: Path) -> Iterator[Any]:
+        """Yield the items of a top-level JSON array.
+        With ijson the array is streamed so memory use doesn't grow with the file size,
+        otherwise the whole file is parsed at once. ijson's C backend rejects integers wider
+        than 64 bits, so when it fails the file is streamed again with the pure Python
+        backend, which keeps them exact, skipping the items already yielded; really invalid
+        JSON fails that parse too."""
+        with open(file_path, 'rb') as f:
+            if ijson is not None:
+                item_count = 0
+                try:
+                    for item in ijson.items(f, 'item', use_float=True):
+                        yield item
+                        item_count += 1
+                    return
+                except ijson.JSONError as e:
+                    logger.warning(f"Streaming JSON parse failed after {item_count} items ({e}), "
+                                   f"continuing with ijson's Python backend")
+                f.seek(0)
+                items = ijson.get_backend('python').items(f, 'item', use_float=True)
+                yield from islice(items, item_count, None)
+                return
+            data = json_loads(f.read())
+            
+        if not isinstance(data, list):
+            raise ValueError("Expected a top-level array in JSON file")
+        yield from data
+
+    def _iter_jsonlines(self, file_path: Path) -> Iterator[Tuple[int, Any]]:
+        """Yield (line number, record) for each line of a JSON Lines file, logging undecodable lines.
+        The file is memory mapped and split with mmap.readline, which scans for newlines in C
+        and hands the decoder bytes without going through buffered text reading."""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return  # Empty files can't be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from self._iter_mapped_lines(mm)
+
+    def _iter_mapped_lines(self, mm: mmap.mmap) -> Iterator[Tuple[int, Any]]:
+        """Yield (line number, record) for each line of a mapped JSON Lines file from its position."""
+        for line_num, line in enumerate(iter(mm.readline, b''), 1):
+            try:
+                yield line_num, self._decode_line(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Error decoding JSON on line {line_num}: {e}")
+
+    def _load_records(self, records: Iterator[Tuple[int, Any]], unit: str) -> None:
+        """Load numbered records into the root table, evolving the schema as needed.
+        The schema is discovered from a sample at the start of the input, then every record
+        is checked and inserted in a single pass, with the rows written in batched transactions."""
+        sample = self._begin_load(records)
+        self._insert_records(chain(sample, records), unit)
+        self._end_load()
+
+    def _begin_load(self, records: Iterator[Tuple[int, Any]]) -> List[Tuple[int, Any]]:
+        """Take the schema sample off the start of the records and create the schema it describes."""
+        self._decode_line = json_loads
+        self._record_type = None
+        sample = list(islice(records, SCHEMA_SAMPLE_SIZE))
+        
+        # SQLite DDL is transactional, so new tables and columns join the open transaction
+        self.cursor.execute("BEGIN")
+        self._discover_schema(data for _, data in sample)
+        # Records after the sample are packed (and lines decoded) against the discovered schema
+        self._refresh_packers()
+        return sample
+
+    def _insert_records(self, records: Iterable[Tuple[int, Any]], unit: str) -> None:
+        """Insert numbered records, committing every BATCH_SIZE records."""
+        for record_num, data in records:
+            self._load_record(record_num, data, unit)
+            if record_num % 1000 == 0:
+                logger.info(f"Processed {record_num} {unit}s...")
+            if record_num % BATCH_SIZE == 0:
+                self._commit_batch()
+
+    def _load_record(self, record_num: int, data: Any, unit: str) -> None:
+        """Insert one record, logging rather than raising if it can't be inserted."""
+        try:
+            if type(data) is self._record_type:
+                self._insert_record(data)
+            else:
+                self._insert_data(self.root_table, data)
+        except Exception as e:
+            logger.error(f"Error processing {unit} {record_num}: {e}")
+
+    def _commit_batch(self) -> None:
+        """Write the pending rows, commit them and start the next transaction."""
+        self._flush_pending()
+        self.conn.commit()
+        self.cursor.execute("BEGIN")
+        self._refresh_packers()
+
+    def _end_load(self) -> None:
+        """Write the remaining rows and commit the last transaction."""
+        self._flush_pending()
+        self.conn.commit()
+        logger.info("File processing completed")
+
+    def _load_jsonlines_parallel(self, file_path: Path) -> None:
+        """Load a JSON Lines file with the records decoded and packed in worker processes.
+        The schema sample is loaded here first; the rest of the file is then split into byte
+        ranges that the workers pack against the schema discovered from it (see _pack_chunk).
+        Their results are consumed in file order, so rows get the same ids as in a sequential
+        load, and only the SQLite writes and the records the schema doesn't cover stay here."""
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sample = self._begin_load(self._iter_mapped_lines(mm))
+            # The line generator is suspended right after the last sampled line
+            offset = mm.tell()
+            line_num = sample[-1][0] if sample else 0
+            self._insert_records(sample, 'line')
+            
+            ranges = []
+            while offset < len(mm):
+                end = mm.find(b'\n', offset + PARALLEL_CHUNK_BYTES)
+                end = len(mm) if end == -1 else end + 1
+                ranges.append((str(file_path), offset, end))
+                offset = end
+        
+        schema = {table_name: (self._key_kinds[table_name], self._key_map[table_name]) for table_name in self._packers}
+        columns = {table_name: self._packer_columns[table_name] for table_name in self._packers}
+        with multiprocessing.Pool(self.workers, _init_pack_worker,
+                                  (self.root_table, schema, self.flatten_mode == 'json_columns')) as pool:
+            # Keep a bounded number of chunks in flight so memory use doesn't grow with the file
+            results = deque()
+            for task in ranges:
+                results.append(pool.apply_async(_pack_chunk, (task,)))
+                if len(results) > 2 * self.workers:
+                    line_num = self._load_packed_chunk(results.popleft().get(), columns, line_num)
+            while results:
+                line_num = self._load_packed_chunk(results.popleft().get(), columns, line_num)
+        self._end_load()
+
+    def _load_packed_chunk(self, result: Tuple[int, List[Tuple[Any, ...]]],
+                           columns: Dict[str, Tuple[str, ...]], line_num: int) -> int:
+        """Queue the rows packed by a worker and insert the lines it left over.
+        Returns the number of the chunk's last line."""
+        line_count, segments = result
+        for segment in segments:
+            if segment[0] == 'rows':
+                self._queue_packed_rows(segment[1], segment[2], columns)
+                continue
+            record_num = line_num + segment[1]
+            try:
+                data = json_loads(segment[2])
+            except json.JSONDecodeError as e:
+                logger.error(f"Error decoding JSON on line {record_num}: {e}")
+                continue
+            self._load_record(record_num, data, 'line')
+        
+        end_line_num = line_num + line_count
+        logger.info(f"Processed {end_line_num} lines...")
+        if end_line_num // BATCH_SIZE > line_num // BATCH_SIZE:
+            self._commit_batch()
+        return end_line_num
+
+    def _queue_packed_rows(self, counts: Dict[str, int], rows: Dict[Tuple[str, Optional[str]], List[Tuple[Any, ...]]],
+                           columns: Dict[str, Tuple[str, ...]]) -> None:
+        """Queue rows packed with chunk-local ids, shifting them onto freshly reserved ids."""
+        bases = {table_name: self._allocate_row_id(table_name, count) - 1 for table_name, count in counts.items()}
+        for (table_name, parent_table), batch in rows.items():
+            base = bases[table_name]
+            if parent_table is None:
+                batch = [(base + values[0], *values[1:]) for values in batch]
+            else:
+                parent_base = bases[parent_table]
+                batch = [(base + values[0], parent_base + values[1], *values[2:]) for values in batch]
+            self._queue_rows(table_name, columns[table_name], batch)
+
     def _process_json_file(self, file_path: Path) -> None:
         """Process a regular JSON file with a top-level array."""
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-                
-            if not isinstance(data, list):
-                raise ValueError("Expected a top-level array in JSON file")
-                
-            # Process schema
-            for item in data:
-                self._create_table_if_not_exists(self.root_table, item)
-            
-            # Insert data
-            for item_num, item in enumerate(data, 1):
-                try:
-                    self._insert_data(self.root_table, item)
-                except Exception as e:
-                    logger.error(f"Error processing item {item_num}: {e}")
-                
-                if item_num % 1000 == 0:
-                    logger.info(f"Processed {item_num} items...")
-                    self.conn.commit()
-                    
-            self.conn.commit()
-            logger.info("File processing completed")
-            
-        except json.JSONDecodeError as e:
+            self._load_records(enumerate(self._iter_json_array(file_path), 1), 'item')
+        except JSON_DECODE_ERRORS as e:
             logger.error(f"Error decoding JSON file: {e}")
             raise
         except Exception as e:
@@ -251,39 +871,125 @@ class JsonToSqlite:
 
     def _process_jsonlines_file(self, file_path: Path) -> None:
         """Process a JSON Lines file."""
-        # Process schema
-        with open(file_path, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    data = json.loads(line)
-                    self._create_table_if_not_exists(self.root_table, data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Analyze Schema - Error decoding JSON on line {line_num}: {e}")
-                except Exception as e:
-                    logger.error(f"Analyze Schema - Error processing line {line_num}: {e}")
-
-        # Insert data
-        with open(file_path, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    data = json.loads(line)
-                    self._insert_data(self.root_table, data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Insert Data - Error decoding JSON on line {line_num}: {e}")
-                except Exception as e:
-                    logger.error(f"Insert Data - Error processing line {line_num}: {e}")
-                
-                if line_num % 1000 == 0:
-                    logger.info(f"Processed {line_num} lines...")
-                    self.conn.commit()
+        self._reading_lines = True
+        try:
+            # Files that fit in one chunk aren't worth starting worker processes for
+            if self.workers > 1 and file_path.stat().st_size > PARALLEL_CHUNK_BYTES:
+                self._load_jsonlines_parallel(file_path)
+            else:
+                self._load_records(self._iter_jsonlines(file_path), 'line')
+        finally:
+            self._reading_lines = False
 
+    def finalize(self) -> None:
+        """Create the indexes deferred until after loading.
+        Building an index once over the loaded rows is much cheaper than maintaining it
+        through every insert."""
+        indexes = [
+            (table_name, parent_ref_col)
+            for table_name, parent_ref_col in self._parent_fk_col.items()
+            if parent_ref_col is not None
+        ]
+        indexes.extend(self.defer_indexes)
+        
+        self.cursor.execute("BEGIN")
+        for table_name, columns in indexes:
+            column_names = [column.strip() for column in columns.split(',')]
+            index_name = f"idx_{table_name}_{'_'.join(column_names)}"
+            logger.info(f"Creating index {index_name}")
+            try:
+                self.cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS {index_name}
+                    ON {table_name} ({', '.join(column_names)})
+                """)
+            except sqlite3.OperationalError as e:
+                logger.error(f"Error creating index {index_name}: {e}")
         self.conn.commit()
-        logger.info("File processing completed")
 
     def close(self):
-        """Close the database connection."""
+        """Create the deferred indexes and close the database connection."""
+        # After a failed load the open transaction is discarded, so there is nothing to index
+        if not self.conn.in_transaction:
+            self.finalize()
         self.conn.close()
 
+# Packers of the schema handed to a worker process, compiled by _init_pack_worker
+_worker_packers: Dict[str, Callable] = {}
+_worker_root_table: Optional[str] = None
+
+def _init_pack_worker(root_table: str, schema: Dict[str, Tuple[Dict[str, Set[str]], Dict[str, str]]],
+                      dump_nested: bool) -> None:
+    """Compile the packers of each table's known keys in a worker process."""
+    global _worker_root_table
+    _worker_root_table = root_table
+    for table_name, (key_kinds, key_map) in schema.items():
+        _worker_packers[table_name] = _compile_packer(
+            table_name, key_kinds, key_map, from_struct=False, dump_nested=dump_nested
+        )
+
+def _pack_record(record: Any, counts: Dict[str, int]) -> Optional[List[Tuple[Tuple[str, Optional[str]], Tuple[Any, ...]]]]:
+    """Pack a record and its nested objects into ((table, parent table), row) pairs in a worker.
+    Row ids continue from counts, which is only advanced if every row of the record packed;
+    otherwise None is returned and the record is left to the main process as a whole."""
+    packed = []
+    added: Dict[str, int] = {}
+    work: Deque[Tuple[str, Dict[str, Any], int, str]] = deque([(_worker_root_table, record, None, None)])
+    while work:
+        table_name, data, parent_id, parent_table = work.popleft()
+        packer = _worker_packers.get(table_name)
+        result = packer(data) if packer is not None and type(data) is dict else None
+        if result is None:
+            return None
+        values, nested_data = result
+        added[table_name] = added.get(table_name, 0) + 1
+        row__id = counts.get(table_name, 0) + added[table_name]
+        if parent_id is not None:
+            packed.append(((table_name, parent_table), (row__id, parent_id, *values)))
+        else:
+            packed.append(((table_name, None), (row__id, *values)))
+        if nested_data:
+            _queue_nested(table_name, nested_data, row__id, work)
+    
+    for table_name, count in added.items():
+        counts[table_name] = counts.get(table_name, 0) + count
+    return packed
+
+def _pack_chunk(task: Tuple[str, int, int]) -> Tuple[int, List[Tuple[Any, ...]]]:
+    """Decode and pack the lines in a byte range of a JSON Lines file in a worker process.
+    Returns the number of lines in the range and its segments in file order: either
+    ('rows', row count per table, rows per (table, parent table)) with chunk-local row ids,
+    or ('line', line number within the range, raw line) for a line that didn't decode or pack."""
+    file_path, start, end = task
+    segments = []
+    counts: Dict[str, int] = {}
+    rows: Dict[Tuple[str, Optional[str]], List[Tuple[Any, ...]]] = {}
+    line_count = 0
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        mm.seek(start)
+        while mm.tell() < end:
+            line = mm.readline()
+            line_count += 1
+            try:
+                packed = _pack_record(json_loads(line), counts)
+            except Exception:
+                packed = None
+            if packed is None:
+                # Ids restart per segment, so rows after the line can be shifted independently
+                if counts:
+                    segments.append(('rows', counts, rows))
+                    counts = {}
+                    rows = {}
+                segments.append(('line', line_count, line))
+                continue
+            for key, values in packed:
+                batch = rows.get(key)
+                if batch is None:
+                    batch = rows[key] = []
+                batch.append(values)
+    if counts:
+        segments.append(('rows', counts, rows))
+    return line_count, segments
+
 def main():
     import argparse
     
@@ -291,10 +997,23 @@ def main():
     parser.add_argument('input_file', help='Input JSON Lines file')
     parser.add_argument('--db', default='output.db', help='Output SQLite database file')
     parser.add_argument('--root-table', default='root', help='Name of the root table (default: root)')
+    parser.add_argument('--index', action='append', default=[], metavar='TABLE:COLUMNS',
+                        help='Create an index on comma separated columns of a table after loading (repeatable)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes decoding JSON Lines records in parallel (default: 1)')
+    parser.add_argument('--flatten-mode', choices=['normalize', 'json_columns'], default='normalize',
+                        help='Store nested values in child tables or as JSON text columns (default: normalize)')
     
     args = parser.parse_args()
     
-    converter = JsonToSqlite(args.db, args.root_table)
+    defer_indexes = []
+    for index in args.index:
+        table_name, _, columns = index.partition(':')
+        if not columns:
+            parser.error(f"Invalid --index {index!r}, expected TABLE:COLUMNS")
+        defer_indexes.append((table_name, columns))
+    
+    converter = JsonToSqlite(args.db, args.root_table, defer_indexes, args.workers, args.flatten_mode)
     try:
         converter.process_file(args.input_file)
     finally: